@@ -1,46 +1,72 @@
 import json
+import os
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 import matplotlib.pyplot as plt
 import numpy as np
 
-from src.sokoban import Sokoban, heuristica_euclidean, heuristica_manhattan
-
-def run_solver(file_path, algorithm, heuristic=None, runs=50):
-    times = []
-    solution_lengths = []
-    expanded_nodes = []
-    frontier_nodes = []
-
-    for _ in range(runs):
-        game = Sokoban(file_path)
-
-        start_time = time.time()
-
-        if algorithm == "bfs":
-            solution = game.bfs()
-        elif algorithm == "dfs":
-            solution = game.dfs()
-        elif algorithm in ["greedy", "astar"]:
-            if heuristic == "manhattan":
-                heuristic_fn = heuristica_manhattan
-            elif heuristic == "euclidean":
-                heuristic_fn = heuristica_euclidean
-            else:
-                raise ValueError("Heurística inválida")
-
-            use_astar = algorithm == "astar"
-            solution = game.informed_search(heuristic_fn, use_astar)
+from src.sokoban import Sokoban, heuristica_euclidean, heuristica_manhattan, heuristica_matching
+
+# Niveles ya parseados de cada proceso trabajador, cargados una sola vez al
+# iniciar el pool en lugar de en cada corrida
+games = {}
+
+
+def init_worker(parsed_games):
+    games.update(parsed_games)
+
+
+def solve(game, algorithm, heuristic=None):
+    if algorithm == "bfs":
+        return game.bfs()
+    elif algorithm == "dfs":
+        return game.dfs()
+    elif algorithm == "push_bfs":
+        return game.push_search()
+    elif algorithm in ["greedy", "astar", "push_greedy", "push_astar", "idastar", "smastar"]:
+        if heuristic == "manhattan":
+            heuristic_fn = heuristica_manhattan
+        elif heuristic == "euclidean":
+            heuristic_fn = heuristica_euclidean
+        elif heuristic == "matching":
+            heuristic_fn = heuristica_matching
+        else:
+            raise ValueError("Heurística inválida")
+
+        use_astar = algorithm.endswith("astar")
+
+        if algorithm == "idastar":
+            return game.ida_search(heuristic_fn)
+        elif algorithm == "smastar":
+            return game.bounded_search(heuristic_fn)
+        elif algorithm.startswith("push_"):
+            return game.push_search(heuristic_fn, use_astar)
         else:
-            raise ValueError("Algoritmo inválido")
+            return game.informed_search(heuristic_fn, use_astar)
+    else:
+        raise ValueError("Algoritmo inválido")
 
-        end_time = time.time()
-        execution_time = end_time - start_time
 
-        times.append(execution_time)
-        solution_lengths.append(len(solution["path"]) if isinstance(solution, dict) else len(solution))
-        expanded_nodes.append(solution.get("expanded_nodes", 0))
-        frontier_nodes.append(solution.get("frontier_nodes", 0))
+def run_once(level_file, algorithm, heuristic):
+    game = games[level_file]
+
+    start_time = time.time()
+    solution = solve(game, algorithm, heuristic)
+    end_time = time.time()
+
+    return {
+        "time": end_time - start_time,
+        "length": len(solution["path"]),
+        "expanded": solution.get("expanded_nodes", 0),
+        "frontier": solution.get("frontier_nodes", 0),
+    }
+
+
+def summarize(runs):
+    times = [run["time"] for run in runs]
+    solution_lengths = [run["length"] for run in runs]
 
     return {
         "times": times,
@@ -49,10 +75,35 @@ def run_solver(file_path, algorithm, heuristic=None, runs=50):
         "std_time": np.std(times),
         "avg_length": np.mean(solution_lengths),
         "std_length": np.std(solution_lengths),
-        "avg_expanded": np.mean(expanded_nodes),
-        "avg_frontier": np.mean(frontier_nodes),
+        "avg_expanded": np.mean([run["expanded"] for run in runs]),
+        "avg_frontier": np.mean([run["frontier"] for run in runs]),
     }
 
+
+def run_solvers(level_files, algorithms, runs=50, workers=None):
+    # Cada nivel se parsea una sola vez y se reparte a los procesos. Todas las
+    # corridas se encolan juntas y los resultados se guardan por posición, así
+    # el agregado no depende del orden en que terminen
+    parsed_games = {level_file: Sokoban(level_file) for level_file in level_files}
+    tasks = [(level_file, algo["name"], algo["heuristic"]) for level_file in level_files for algo in algorithms]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(parsed_games,)) as executor:
+        futures = [[executor.submit(run_once, *task) for _ in range(runs)] for task in tasks]
+
+        results = {}
+
+        for (level_file, algo_name, heuristic), task_futures in zip(tasks, futures):
+            level_name = level_file.split("/")[-1]
+            key = algo_name if heuristic is None else f"{algo_name}_{heuristic}"
+
+            results.setdefault(level_name, {})[key] = summarize([future.result() for future in task_futures])
+
+            print(f"{key} en {level_name}:")
+            print(f"  Tiempo promedio: {results[level_name][key]['avg_time']:.4f}s")
+            print(f"  Costo promedio: {results[level_name][key]['avg_length']:.2f} pasos")
+
+    return results
+
 def plot_results(results, metric="time"):
     levels = list(results.keys())
     algorithms = list(results[levels[0]].keys())
@@ -121,25 +172,18 @@ def main():
         {"name": "greedy", "heuristic": "euclidean"},
         {"name": "astar", "heuristic": "manhattan"},
         {"name": "astar", "heuristic": "euclidean"},
+        {"name": "greedy", "heuristic": "matching"},
+        {"name": "astar", "heuristic": "matching"},
+        {"name": "idastar", "heuristic": "manhattan"},
+        {"name": "smastar", "heuristic": "manhattan"},
+        {"name": "push_bfs", "heuristic": None},
+        {"name": "push_astar", "heuristic": "manhattan"},
     ]
 
-    results = {}
-
-    for level_file in level_files:
-        level_name = level_file.split("/")[-1]
-        results[level_name] = {}
-
-        for algo in algorithms:
-            algo_name = algo["name"]
-            heuristic = algo["heuristic"]
-
-            key = algo_name if heuristic is None else f"{algo_name}_{heuristic}"
-            print(f"Running {key} on {level_name}...")
-
-            results[level_name][key] = run_solver(level_file, algo_name, heuristic)
+    workers = int(sys.argv[1]) if len(sys.argv) >= 2 else os.cpu_count()
+    print(f"Ejecutando con {workers} procesos")
 
-            print(f"  Tiempo promedio: {results[level_name][key]['avg_time']:.4f}s")
-            print(f"  Costo promedio: {results[level_name][key]['avg_length']:.2f} pasos")
+    results = run_solvers(level_files, algorithms, workers=workers)
 
     with open("sokoban_results.json", "w") as f:
         json.dump(results, f, indent=2)
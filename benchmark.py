@@ -0,0 +1,56 @@
+import sys
+import tracemalloc
+
+from src.sokoban import Sokoban, heuristica_manhattan
+
+SOLVERS = {
+    "bfs": lambda game: game.bfs(),
+    "dfs": lambda game: game.dfs(),
+    "astar": lambda game: game.informed_search(heuristica_manhattan, True),
+    "push_bfs": lambda game: game.push_search(),
+}
+
+
+def measure_memory(file_path, algorithm):
+    game = Sokoban(file_path)
+
+    tracemalloc.start()
+    solution = SOLVERS[algorithm](game)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if solution is None:
+        return None
+
+    # Cada nodo generado queda guardado hasta el final de la búsqueda, ya sea
+    # expandido o todavía en la frontera
+    nodes = solution["expanded_nodes"] + solution["frontier_nodes"]
+
+    return {
+        "peak_bytes": peak,
+        "nodes": nodes,
+        "bytes_per_node": peak / nodes,
+    }
+
+
+def main():
+    level_files = sys.argv[1:] or ["levels/lvl1.txt", "levels/lvl2.txt", "levels/lvl3.txt"]
+
+    print(f"{'Nivel':<12}{'Algoritmo':<12}{'Nodos':>12}{'Pico (MB)':>12}{'Bytes/nodo':>12}")
+
+    for level_file in level_files:
+        level_name = level_file.split("/")[-1]
+
+        for algorithm in SOLVERS:
+            result = measure_memory(level_file, algorithm)
+
+            if result is None:
+                print(f"{level_name:<12}{algorithm:<12}{'sin solución':>12}")
+                continue
+
+            peak_mb = result["peak_bytes"] / 2**20
+            print(f"{level_name:<12}{algorithm:<12}{result['nodes']:>12}{peak_mb:>12.2f}{result['bytes_per_node']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
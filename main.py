@@ -3,7 +3,7 @@ import sys
 import time
 from os.path import basename
 
-from src.sokoban import Sokoban, heuristica_euclidean, heuristica_manhattan
+from src.sokoban import Sokoban, heuristica_euclidean, heuristica_manhattan, heuristica_matching
 from src.visualizer import SokobanVisualizer
 
 
@@ -25,7 +25,9 @@ def main():
         solution = sokoban.bfs()
     elif algo == "dfs":
         solution = sokoban.dfs()
-    elif algo in {"greedy", "astar"}:
+    elif algo == "push_bfs":
+        solution = sokoban.push_search()
+    elif algo in {"greedy", "astar", "push_greedy", "push_astar", "idastar", "smastar"}:
         if heuristic is None:
             print("Debe especificar una heurística para usar con greedy o astar.")
             print("Ejemplo: python main.py nivel_1.txt greedy manhattan")
@@ -35,11 +37,21 @@ def main():
             heuristic_fn = heuristica_manhattan
         elif heuristic == "euclidean":
             heuristic_fn = heuristica_euclidean
+        elif heuristic == "matching":
+            heuristic_fn = heuristica_matching
         else:
             raise ValueError("Heurística no válida")
 
-        use_astar = algo == "astar"
-        solution = sokoban.informed_search(heuristic_fn, use_astar)
+        use_astar = algo.endswith("astar")
+
+        if algo == "idastar":
+            solution = sokoban.ida_search(heuristic_fn)
+        elif algo == "smastar":
+            solution = sokoban.bounded_search(heuristic_fn)
+        elif algo.startswith("push_"):
+            solution = sokoban.push_search(heuristic_fn, use_astar)
+        else:
+            solution = sokoban.informed_search(heuristic_fn, use_astar)
 
     else:
         raise ValueError("Algoritmo no válido")
@@ -1,6 +1,9 @@
 import heapq
+import random
+from array import array
+from collections import deque
 from enum import Enum
-from itertools import count
+from itertools import combinations, count
 
 movimientos = {
     "UP": (0, -1),
@@ -9,6 +12,27 @@ movimientos = {
     "RIGHT": (1, 0),
 }
 
+# Los índices de dirección siguen el orden de `movimientos`, así que la
+# dirección opuesta a `d` es siempre `d ^ 1`
+direcciones = list(movimientos)
+
+# Semilla fija para que las claves Zobrist sean las mismas en cada ejecución.
+# Las claves usan 63 bits y el bit restante marca las celdas ocupadas de la
+# tabla hash de `NodeStore`
+ZOBRIST_SEED = 0x5083A4
+ZOBRIST_BITS = 63
+OCCUPIED = 1 << ZOBRIST_BITS
+
+# Distancia usada para los pares caja-objetivo imposibles. Es mayor que
+# cualquier suma de distancias reales, así que un estado que la necesita
+# queda siempre detrás de los que tienen solución
+UNREACHABLE = 1 << 20
+
+# Entradas de la tabla de transposición de IDA* y nodos vivos por defecto de
+# la búsqueda A* con memoria acotada
+IDA_TABLE_SIZE = 1 << 16
+MAX_LIVE_NODES = 1 << 19
+
 
 class Chars(str, Enum):
     WALL = "#"
@@ -20,29 +44,111 @@ class Chars(str, Enum):
     PLAYER_ON_TARGET = "+"
 
 
-class State:
-    def __init__(self, player, boxes, move=None, parent=None):
+class NodeStore:
+    # Nodos de búsqueda guardados en arreglos paralelos: el nodo `i` ocupa la
+    # posición `i` de cada arreglo. Para no crear objetos por nodo, el índice
+    # de clave Zobrist a nodo es una tabla hash propia con direccionamiento
+    # abierto sobre dos arreglos, donde el bit alto marca la celda ocupada.
+    # El camino se arma recorriendo `parents` solo para el nodo objetivo
+    def __init__(self, capacity=1 << 12):
+        self.table_keys = array("Q", [0]) * capacity
+        self.table_nodes = array("i", [0]) * capacity
+        self.mask = capacity - 1
+        self.keys = array("Q")
+        self.parents = array("l")
+        self.moves = array("i")
+        self.players = array("i")
+        self.boxes = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, key):
+        key |= OCCUPIED
+        slot = key & self.mask
+
+        while self.table_keys[slot]:
+            if self.table_keys[slot] == key:
+                return self.table_nodes[slot]
+            slot = (slot + 1) & self.mask
+
+        return -1
+
+    def insert(self, key, node):
+        key |= OCCUPIED
+        slot = key & self.mask
+
+        while self.table_keys[slot]:
+            slot = (slot + 1) & self.mask
+
+        self.table_keys[slot] = key
+        self.table_nodes[slot] = node
+
+    def add(self, key, parent, move, player, boxes):
+        node = len(self.keys)
+
+        # Se duplica la tabla al llegar a dos tercios de ocupación para que
+        # las secuencias de sondeo sigan siendo cortas
+        if 3 * (node + 1) > 2 * len(self.table_keys):
+            capacity = 2 * len(self.table_keys)
+            self.table_keys = array("Q", [0]) * capacity
+            self.table_nodes = array("i", [0]) * capacity
+            self.mask = capacity - 1
+            for i, old_key in enumerate(self.keys):
+                self.insert(old_key, i)
+
+        self.insert(key, node)
+        self.keys.append(key)
+        self.parents.append(parent)
+        self.moves.append(move)
+        self.players.append(player)
+        self.boxes.append(boxes)
+        return node
+
+    def path(self, node):
+        moves = []
+        while self.parents[node] >= 0:
+            moves.append(self.moves[node])
+            node = self.parents[node]
+        return moves[::-1]
+
+
+class BoundedNode:
+    # Nodo de la búsqueda con memoria acotada. `children` cuenta los hijos que
+    # siguen en memoria y `forgotten` guarda el menor f de los que se borraron
+    __slots__ = ("key", "player", "boxes", "g", "h", "f", "parent", "move", "children", "forgotten", "token")
+
+    def __init__(self, key, player, boxes, g, h, f, parent, move):
+        self.key = key
         self.player = player
         self.boxes = boxes
-        self.move = move
+        self.g = g
+        self.h = h
+        self.f = f
         self.parent = parent
-
-    def get_path(self):
-        path = []
-        node = self
-
-        while node is not None:
-            player = {"x": node.player[0], "y": node.player[1]}
-            boxes = [{"x": box[0], "y": box[1]} for box in node.boxes]
-            path.append({"player": player, "boxes": boxes, "move": node.move})
-            node = node.parent
-
-        return path[::-1]
+        self.move = move
+        self.children = 0
+        self.forgotten = float("inf")
+        self.token = -1
 
 
 class Sokoban:
     def __init__(self, filename):
         self.map, self.player, self.boxes, self.targets = self.load_level(filename)
+        self.cells, self.cell_index, self.neighbors = self.index_cells()
+
+        # Las cajas se representan como un bitset sobre las celdas indexadas y
+        # cada estado se identifica por su hash Zobrist: el XOR de un valor
+        # aleatorio de 63 bits por caja y otro por la posición del jugador.
+        # Mover una caja o al jugador actualiza la clave con dos XOR
+        rng = random.Random(ZOBRIST_SEED)
+        self.zobrist_boxes = [rng.getrandbits(ZOBRIST_BITS) for _ in self.cells]
+        self.zobrist_player = [rng.getrandbits(ZOBRIST_BITS) for _ in self.cells]
+        self.targets_mask = self.encode_boxes(self.targets)
+        self.target_cells = [self.cell_index[target] for target in sorted(self.targets)]
+        self.push_distances = self.compute_push_distances()
+        self.dead = self.find_dead_cells()
+        self.manhattan_distances, self.euclidean_distances = self.compute_distance_tables()
 
     def load_level(self, filename):
         map = []
@@ -68,176 +174,845 @@ class Sokoban:
 
         return map, player, boxes, targets
 
-    def bfs(self):
-        root = State(self.player, frozenset(self.boxes))
-        frontier = [root]
-        visited = set()
+    def index_cells(self):
+        # Solo se indexan las celdas alcanzables por el jugador (ignorando las
+        # cajas), que son las únicas que pueden ocupar el jugador o una caja
+        reachable = {self.player}
+        pending = [self.player]
+
+        while pending:
+            x, y = pending.pop()
+            for dx, dy in movimientos.values():
+                cell = (x + dx, y + dy)
+                if cell not in reachable and not self.is_wall(cell):
+                    reachable.add(cell)
+                    pending.append(cell)
+
+        cells = sorted(reachable, key=lambda cell: (cell[1], cell[0]))
+        cell_index = {cell: i for i, cell in enumerate(cells)}
+        neighbors = [[cell_index.get((x + dx, y + dy), -1) for dx, dy in movimientos.values()] for x, y in cells]
+
+        return cells, cell_index, neighbors
+
+    def is_wall(self, cell):
+        x, y = cell
+        if y < 0 or y >= len(self.map) or x < 0 or x >= len(self.map[y]):
+            return True
+        return self.map[y][x] == Chars.WALL
+
+    def encode_boxes(self, boxes):
+        bits = 0
+        for box in boxes:
+            bits |= 1 << self.cell_index[box]
+        return bits
+
+    def box_cells(self, bits):
+        boxes = []
+        while bits:
+            low = bits & -bits
+            boxes.append(low.bit_length() - 1)
+            bits ^= low
+        return boxes
+
+    def compute_push_distances(self):
+        # push_distances[cell][t] es la mínima cantidad de empujes para llevar
+        # una caja desde `cell` hasta el objetivo `t` ignorando las demás
+        # cajas. Se calcula tirando la caja hacia atrás desde cada objetivo:
+        # la caja en `box` se tira hacia `prev` si el jugador entra en `prev`
+        # y tiene lugar para retroceder una celda más en la misma dirección
+        distances = [[UNREACHABLE] * len(self.target_cells) for _ in self.cells]
+
+        for t, target in enumerate(self.target_cells):
+            distances[target][t] = 0
+            pending = deque([target])
+
+            while pending:
+                box = pending.popleft()
+                for direction in range(len(direcciones)):
+                    prev = self.neighbors[box][direction]
+                    if prev < 0 or distances[prev][t] != UNREACHABLE or self.neighbors[prev][direction] < 0:
+                        continue
+                    distances[prev][t] = distances[box][t] + 1
+                    pending.append(prev)
 
-        expanded_nodes = 0
+        return distances
 
-        while frontier:
-            node = frontier.pop(0)
-            expanded_nodes += 1
+    def compute_distance_tables(self):
+        # Distancia de cada celda al objetivo más cercano, para que las
+        # heurísticas aditivas sean una suma de consultas a tabla
+        manhattan = []
+        euclidean = []
+
+        for x, y in self.cells:
+            manhattan.append(min(abs(x - tx) + abs(y - ty) for tx, ty in self.targets))
+            euclidean.append(min(((x - tx) ** 2 + (y - ty) ** 2) ** 0.5 for tx, ty in self.targets))
+
+        return manhattan, euclidean
+
+    def find_dead_cells(self):
+        # Una celda está muerta si una caja puesta ahí no llega a ningún objetivo
+        return [min(distances, default=UNREACHABLE) == UNREACHABLE for distances in self.push_distances]
+
+    def zobrist(self, boxes):
+        key = 0
+        while boxes:
+            low = boxes & -boxes
+            key ^= self.zobrist_boxes[low.bit_length() - 1]
+            boxes ^= low
+        return key
+
+    def successors(self, player, boxes, key):
+        key ^= self.zobrist_player[player]
+
+        for direction in range(len(direcciones)):
+            new_player = self.neighbors[player][direction]
 
-            if all(box in self.targets for box in node.boxes):
-                frontier_count = len(frontier)
-                targets = [{"x": target[0], "y": target[1]} for target in self.targets]
-                path = node.get_path()
-                return {
-                    "map": self.map,
-                    "targets": targets,
-                    "frontier_nodes": frontier_count,
-                    "expanded_nodes": expanded_nodes,
-                    "steps": len(path) - 1,
-                    "path": path,
-                }
-
-            for move, (dx, dy) in movimientos.items():
-                new_player = (node.player[0] + dx, node.player[1] + dy)
-
-                if self.map[new_player[1]][new_player[0]] == Chars.WALL:
+            if new_player < 0:
+                continue
+
+            new_key = key ^ self.zobrist_player[new_player]
+
+            if boxes >> new_player & 1:
+                new_box = self.neighbors[new_player][direction]
+
+                if new_box < 0 or self.dead[new_box] or boxes >> new_box & 1:
                     continue
 
-                new_boxes = node.boxes
+                new_key ^= self.zobrist_boxes[new_player] ^ self.zobrist_boxes[new_box]
+                yield direction, new_player, boxes ^ (1 << new_player) ^ (1 << new_box), new_box, new_key
+            else:
+                yield direction, new_player, boxes, -1, new_key
 
-                if new_player in node.boxes:
-                    new_box = (new_player[0] + dx, new_player[1] + dy)
+    def is_freeze_deadlock(self, boxes, box):
+        # Solo se mira alrededor de la caja recién empujada: si quedó
+        # congelada junto con otra caja fuera de un objetivo no hay solución.
+        # Esto incluye los bloques de 2x2 formados por cajas y paredes
+        frozen, on_target = self.is_frozen(boxes, box, {box})
+        return frozen and not on_target
 
-                    if new_box in node.boxes or self.map[new_box[1]][new_box[0]] == Chars.WALL:
-                        continue
+    def is_frozen(self, boxes, box, checked):
+        on_target = self.targets_mask >> box & 1 == 1
+
+        for d1, d2 in ((0, 1), (2, 3)):
+            a = self.neighbors[box][d1]
+            b = self.neighbors[box][d2]
+
+            if a < 0 or b < 0 or (self.dead[a] and self.dead[b]):
+                continue
+
+            blocked = False
+
+            for side in (a, b):
+                if not boxes >> side & 1:
+                    continue
+
+                # Las cajas que ya se están analizando cuentan como paredes
+                if side in checked:
+                    blocked = True
+                    break
+
+                checked.add(side)
+                side_frozen, side_on_target = self.is_frozen(boxes, side, checked)
+
+                if side_frozen:
+                    on_target = on_target and side_on_target
+                    blocked = True
+                    break
+
+                checked.discard(side)
+
+            if not blocked:
+                return False, on_target
+
+        return True, on_target
+
+    def reachable(self, player, boxes):
+        # Bitset de las celdas a las que llega el jugador sin empujar cajas
+        reach = 1 << player
+        pending = [player]
+
+        while pending:
+            cell = pending.pop()
+            for neighbor in self.neighbors[cell]:
+                if neighbor >= 0 and not (reach | boxes) >> neighbor & 1:
+                    reach |= 1 << neighbor
+                    pending.append(neighbor)
+
+        return reach
+
+    def push_successors(self, reach, boxes, key):
+        bits = boxes
 
-                    new_boxes = frozenset((new_box if box == new_player else box) for box in node.boxes)
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            box = low.bit_length() - 1
 
-                new_state = (new_player, new_boxes)
+            for direction in range(len(direcciones)):
+                behind = self.neighbors[box][direction ^ 1]
 
-                if new_state not in visited:
-                    visited.add(new_state)
-                    new_node = State(new_player, new_boxes, move, node)
-                    frontier.append(new_node)
+                if behind < 0 or not reach >> behind & 1:
+                    continue
+
+                new_box = self.neighbors[box][direction]
+
+                if new_box < 0 or self.dead[new_box] or boxes >> new_box & 1:
+                    continue
+
+                new_key = key ^ self.zobrist_boxes[box] ^ self.zobrist_boxes[new_box]
+                yield box, direction, boxes ^ low ^ (1 << new_box), new_box, new_key
+
+    def pull_successors(self, reach, boxes, key):
+        # Inverso de `push_successors`: el jugador, parado junto a una caja,
+        # retrocede una celda alejándose de ella y la arrastra a la celda que
+        # dejó libre. `direction` es hacia dónde se mueve la caja, así que el
+        # jugador termina en `neighbors[new_box][direction]`
+        bits = boxes
+
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            box = low.bit_length() - 1
+
+            for direction in range(len(direcciones)):
+                new_box = self.neighbors[box][direction]
+
+                if new_box < 0 or not reach >> new_box & 1:
+                    continue
+
+                back = self.neighbors[new_box][direction]
+
+                if back < 0 or boxes >> back & 1:
+                    continue
+
+                new_key = key ^ self.zobrist_boxes[box] ^ self.zobrist_boxes[new_box]
+                yield box, direction, boxes ^ low ^ (1 << new_box), new_box, new_key
+
+    def walk(self, start, goal, boxes):
+        parents = {start: None}
+        pending = deque([start])
+
+        while pending:
+            cell = pending.popleft()
+
+            if cell == goal:
+                break
+
+            for direction, neighbor in enumerate(self.neighbors[cell]):
+                if neighbor >= 0 and neighbor not in parents and not boxes >> neighbor & 1:
+                    parents[neighbor] = (cell, direction)
+                    pending.append(neighbor)
+
+        return self.trace_moves(parents, goal)
+
+    def expand_pushes(self, pushes):
+        # Convierte una secuencia de empujes en la secuencia de pasos completa,
+        # agregando antes de cada empuje la caminata hasta detrás de la caja
+        player = self.cell_index[self.player]
+        boxes = self.encode_boxes(self.boxes)
+        moves = []
+
+        for box, direction in pushes:
+            moves += self.walk(player, self.neighbors[box][direction ^ 1], boxes)
+            moves.append(direction)
+            boxes ^= (1 << box) | (1 << self.neighbors[box][direction])
+            player = box
+
+        return moves
+
+    def trace_moves(self, parents, key):
+        moves = []
+        while parents[key] is not None:
+            key, move = parents[key]
+            moves.append(move)
+        return moves[::-1]
+
+    def replay(self, moves):
+        player = self.player
+        boxes = set(self.boxes)
+        path = [{"player": {"x": player[0], "y": player[1]}, "boxes": [{"x": box[0], "y": box[1]} for box in boxes], "move": None}]
+
+        for direction in moves:
+            move = direcciones[direction]
+            dx, dy = movimientos[move]
+            player = (player[0] + dx, player[1] + dy)
+
+            if player in boxes:
+                boxes.remove(player)
+                boxes.add((player[0] + dx, player[1] + dy))
+
+            path.append({"player": {"x": player[0], "y": player[1]}, "boxes": [{"x": box[0], "y": box[1]} for box in boxes], "move": move})
+
+        return path
+
+    def build_solution(self, moves, frontier_nodes, expanded_nodes, pruned_nodes):
+        targets = [{"x": target[0], "y": target[1]} for target in self.targets]
+        path = self.replay(moves)
+        return {
+            "map": self.map,
+            "targets": targets,
+            "frontier_nodes": frontier_nodes,
+            "expanded_nodes": expanded_nodes,
+            "pruned_nodes": pruned_nodes,
+            "steps": len(path) - 1,
+            "path": path,
+        }
+
+    def bfs(self):
+        player = self.cell_index[self.player]
+        boxes = self.encode_boxes(self.boxes)
+        store = NodeStore()
+        store.add(self.zobrist(boxes) ^ self.zobrist_player[player], -1, -1, player, boxes)
+
+        # Los nodos se expanden en el orden en que se agregan, así que la
+        # frontera es simplemente el tramo del almacén a partir de `head`
+        head = 0
+
+        expanded_nodes = 0
+        pruned_nodes = 0
+
+        while head < len(store):
+            node = head
+            head += 1
+            expanded_nodes += 1
+
+            player = store.players[node]
+            boxes = store.boxes[node]
+
+            if boxes & self.targets_mask == boxes:
+                return self.build_solution(store.path(node), len(store) - head, expanded_nodes, pruned_nodes)
+
+            for direction, new_player, new_boxes, new_box, new_key in self.successors(player, boxes, store.keys[node]):
+                if store.find(new_key) < 0:
+                    if new_box >= 0 and self.is_freeze_deadlock(new_boxes, new_box):
+                        pruned_nodes += 1
+                        continue
+
+                    store.add(new_key, node, direction, new_player, new_boxes)
 
         return None
 
     def dfs(self):
-        root = State(self.player, frozenset(self.boxes))
-        frontier = [root]
-        visited = set()
+        player = self.cell_index[self.player]
+        boxes = self.encode_boxes(self.boxes)
+        store = NodeStore()
+        frontier = [store.add(self.zobrist(boxes) ^ self.zobrist_player[player], -1, -1, player, boxes)]
 
         expanded_nodes = 0
+        pruned_nodes = 0
 
         while frontier:
             node = frontier.pop()
             expanded_nodes += 1
 
-            if all(box in self.targets for box in node.boxes):
-                frontier_count = len(frontier)
-                targets_dict = [{"x": target[0], "y": target[1]} for target in self.targets]
-                path = node.get_path()
-                return {
-                    "map": self.map,
-                    "targets": targets_dict,
-                    "frontier_nodes": frontier_count,
-                    "expanded_nodes": expanded_nodes,
-                    "steps": len(path) - 1,
-                    "path": path,
-                }
-
-            for move, (dx, dy) in movimientos.items():
-                new_player = (node.player[0] + dx, node.player[1] + dy)
-
-                if self.map[new_player[1]][new_player[0]] == Chars.WALL:
+            player = store.players[node]
+            boxes = store.boxes[node]
+
+            if boxes & self.targets_mask == boxes:
+                return self.build_solution(store.path(node), len(frontier), expanded_nodes, pruned_nodes)
+
+            for direction, new_player, new_boxes, new_box, new_key in self.successors(player, boxes, store.keys[node]):
+                if store.find(new_key) < 0:
+                    if new_box >= 0 and self.is_freeze_deadlock(new_boxes, new_box):
+                        pruned_nodes += 1
+                        continue
+
+                    frontier.append(store.add(new_key, node, direction, new_player, new_boxes))
+
+        return None
+
+    def informed_search(self, heuristic_fn, use_astar: bool):
+        player = self.cell_index[self.player]
+        boxes = self.encode_boxes(self.boxes)
+        store = NodeStore()
+        root = store.add(self.zobrist(boxes) ^ self.zobrist_player[player], -1, -1, player, boxes)
+        costs = array("l", [0])
+        estimates = array("d", [heuristic_fn(boxes, self)])
+        frontier = [(estimates[root], root)]
+
+        expanded_nodes = 0
+        pruned_nodes = 0
+
+        while frontier:
+            _, node = heapq.heappop(frontier)
+            expanded_nodes += 1
+
+            player = store.players[node]
+            boxes = store.boxes[node]
+            h = estimates[node]
+
+            if boxes & self.targets_mask == boxes:
+                return self.build_solution(store.path(node), len(frontier), expanded_nodes, pruned_nodes)
+
+            for direction, new_player, new_boxes, new_box, new_key in self.successors(player, boxes, store.keys[node]):
+                new_g = costs[node] + 1
+                known = store.find(new_key)
+
+                if known >= 0 and costs[known] <= new_g:
+                    continue
+
+                if new_box >= 0 and self.is_freeze_deadlock(new_boxes, new_box):
+                    pruned_nodes += 1
                     continue
 
-                new_boxes = node.boxes
+                # Las heurísticas solo dependen de las cajas: si no hubo
+                # empuje se reutiliza la del padre, y si lo hubo se le pasa
+                # la caja movida para que la actualice incrementalmente
+                new_h = h if new_box < 0 else heuristic_fn(new_boxes, self, h, (new_player, new_box))
+
+                if known < 0:
+                    known = store.add(new_key, node, direction, new_player, new_boxes)
+                    costs.append(new_g)
+                    estimates.append(new_h)
+                else:
+                    store.parents[known] = node
+                    store.moves[known] = direction
+                    costs[known] = new_g
+
+                priority = new_h if not use_astar else new_g + new_h
+                heapq.heappush(frontier, (priority, known))
+
+        return None
+
+    def ida_search(self, heuristic_fn, table_size: int = IDA_TABLE_SIZE):
+        # IDA*: búsquedas en profundidad sucesivas acotadas por f = g + h. Solo
+        # se guarda el camino actual y una tabla de transposición chica con el
+        # menor g con el que se llegó a cada estado en la iteración
+        player = self.cell_index[self.player]
+        boxes = self.encode_boxes(self.boxes)
+        root = self.zobrist(boxes) ^ self.zobrist_player[player]
+        h = heuristic_fn(boxes, self)
+        threshold = h
+
+        expanded_nodes = 0
+        pruned_nodes = 0
+
+        if boxes & self.targets_mask == boxes:
+            return self.build_solution([], 0, 1, 0)
+
+        while threshold < UNREACHABLE:
+            next_threshold = float("inf")
+            table = {}
+            on_path = {root}
+            moves = []
+            stack = [(self.successors(player, boxes, root), root, h)]
+            expanded_nodes += 1
+
+            while stack:
+                children, key, h = stack[-1]
+                g = len(stack) - 1
 
-                if new_player in node.boxes:
-                    new_box = (new_player[0] + dx, new_player[1] + dy)
+                for move, new_player, new_boxes, new_box, new_key in children:
+                    new_g = g + 1
 
-                    if new_box in node.boxes or self.map[new_box[1]][new_box[0]] == Chars.WALL:
+                    if new_key in on_path or table.get(new_key, new_g + 1) <= new_g:
                         continue
 
-                    new_boxes = frozenset((new_box if box == new_player else box) for box in node.boxes)
+                    if new_box >= 0 and self.is_freeze_deadlock(new_boxes, new_box):
+                        pruned_nodes += 1
+                        continue
 
-                new_state = (new_player, new_boxes)
+                    new_h = h if new_box < 0 else heuristic_fn(new_boxes, self, h, (new_player, new_box))
+
+                    if new_g + new_h > threshold:
+                        next_threshold = min(next_threshold, new_g + new_h)
+                        continue
 
-                if new_state not in visited:
-                    visited.add(new_state)
-                    new_node = State(new_player, new_boxes, move, node)
-                    frontier.append(new_node)
+                    if new_key in table or len(table) < table_size:
+                        table[new_key] = new_g
+
+                    moves.append(move)
+
+                    if new_boxes & self.targets_mask == new_boxes:
+                        return self.build_solution(moves, len(stack), expanded_nodes, pruned_nodes)
+
+                    on_path.add(new_key)
+                    stack.append((self.successors(new_player, new_boxes, new_key), new_key, new_h))
+                    expanded_nodes += 1
+                    break
+                else:
+                    stack.pop()
+                    on_path.discard(key)
+                    if moves:
+                        moves.pop()
+
+            threshold = next_threshold
 
         return None
 
-    def informed_search(self, heuristic_fn, use_astar: bool):
-        root = State(self.player, frozenset(self.boxes))
+    def bounded_search(self, heuristic_fn, max_nodes: int = MAX_LIVE_NODES):
+        # A* con memoria acotada al estilo SMA*: cuando hay más de `max_nodes`
+        # nodos vivos se olvida la hoja abierta de mayor f (y menor g). El
+        # padre recuerda el menor f olvidado y vuelve a la frontera con ese
+        # valor para regenerar esa rama si llega a ser la más prometedora
+        player = self.cell_index[self.player]
+        boxes = self.encode_boxes(self.boxes)
+        key = self.zobrist(boxes) ^ self.zobrist_player[player]
+        h = heuristic_fn(boxes, self)
+        root = BoundedNode(key, player, boxes, 0, h, h, None, None)
+        nodes = {key: root}
         frontier = []
-        visited = dict()
+        worst = []
         counter = count()
 
         expanded_nodes = 0
+        pruned_nodes = 0
+
+        # Los montículos usan borrado perezoso: una entrada es válida solo si
+        # el nodo sigue vivo y conserva el token con el que se agregó
+        def is_live(entry):
+            node = entry[3]
+            return node.token == entry[2] and nodes.get(node.key) is node
+
+        def open_node(node):
+            node.token = next(counter)
+            heapq.heappush(frontier, (node.f, -node.g, node.token, node))
+            heapq.heappush(worst, (-node.f, node.g, node.token, node))
+
+        def forget(node):
+            del nodes[node.key]
+            node.token = -1
+            parent = node.parent
+            parent.children -= 1
+            parent.forgotten = min(parent.forgotten, node.f)
+
+            if parent.token < 0 or parent.forgotten < parent.f:
+                parent.f = parent.forgotten
+                open_node(parent)
+            elif parent.children == 0:
+                heapq.heappush(worst, (-parent.f, parent.g, parent.token, parent))
+
+        def forget_worst():
+            # Los nodos abiertos con hijos vivos no se pueden olvidar, así que
+            # se sacan de `worst` y vuelven a entrar cuando quedan sin hijos
+            while worst:
+                entry = heapq.heappop(worst)
+
+                if is_live(entry) and not entry[3].children and entry[3] is not root:
+                    forget(entry[3])
+                    return True
+
+            return False
+
+        open_node(root)
 
-        h = heuristic_fn(root, self.targets)
-        heapq.heappush(frontier, (h, next(counter), 0, root))
+        while frontier:
+            entry = heapq.heappop(frontier)
+
+            if not is_live(entry):
+                continue
+
+            node = entry[3]
+
+            if node.f >= UNREACHABLE:
+                break
+
+            node.token = -1
+            node.forgotten = float("inf")
+            expanded_nodes += 1
+
+            if node.boxes & self.targets_mask == node.boxes:
+                moves = []
+                while node.parent is not None:
+                    moves.append(node.move)
+                    node = node.parent
+                live = sum(1 for node in nodes.values() if node.token >= 0)
+                return self.build_solution(moves[::-1], live, expanded_nodes, pruned_nodes)
+
+            for move, new_player, new_boxes, new_box, new_key in self.successors(node.player, node.boxes, node.key):
+                new_g = node.g + 1
+                known = nodes.get(new_key)
+
+                if known is not None and known.g <= new_g:
+                    continue
+
+                if new_box >= 0 and self.is_freeze_deadlock(new_boxes, new_box):
+                    pruned_nodes += 1
+                    continue
+
+                new_h = node.h if new_box < 0 else heuristic_fn(new_boxes, self, node.h, (new_player, new_box))
+                new_f = max(node.f, new_g + new_h)
+
+                if known is not None:
+                    # Camino mejor a un nodo vivo: se lo cuelga del nuevo padre
+                    # y se lo reabre, manteniendo a sus hijos en memoria
+                    old_parent = known.parent
+                    old_parent.children -= 1
+                    known.g, known.h, known.f, known.parent, known.move = new_g, new_h, new_f, node, move
+                    child = known
+
+                    if old_parent.children == 0 and old_parent is not root and old_parent is not node:
+                        if old_parent.token >= 0:
+                            heapq.heappush(worst, (-old_parent.f, old_parent.g, old_parent.token, old_parent))
+                        else:
+                            old_parent.f = float("inf")
+                            forget(old_parent)
+                else:
+                    child = BoundedNode(new_key, new_player, new_boxes, new_g, new_h, new_f, node, move)
+                    nodes[new_key] = child
+
+                node.children += 1
+                open_node(child)
+
+            # Un nodo sin sucesores nuevos no lleva a nada que no se alcance
+            # mejor por otro lado, así que se olvida con f infinito
+            if node.children == 0 and node is not root:
+                node.f = float("inf")
+                forget(node)
+
+            while len(nodes) > max_nodes and forget_worst():
+                pass
+
+            # Las entradas viejas se descartan al sacarlas, pero los montículos
+            # se reconstruyen si crecen demasiado para no romper la cota
+            if len(frontier) > 2 * max_nodes:
+                frontier = [entry for entry in frontier if is_live(entry)]
+                worst = [entry for entry in worst if is_live(entry)]
+                heapq.heapify(frontier)
+                heapq.heapify(worst)
+
+        return None
+
+    def push_search(self, heuristic_fn=None, use_astar: bool = True):
+        # Búsqueda a nivel de empujes: un nodo es la configuración de cajas más
+        # la región del jugador, representada por su celda de menor índice
+        # (la de más arriba a la izquierda), y cada sucesor es un empuje. El
+        # movimiento guardado en cada nodo es `caja << 2 | dirección`
+        boxes = self.encode_boxes(self.boxes)
+        reach = self.reachable(self.cell_index[self.player], boxes)
+        player = (reach & -reach).bit_length() - 1
+        store = NodeStore()
+        root = store.add(self.zobrist(boxes) ^ self.zobrist_player[player], -1, -1, player, boxes)
+        costs = array("l", [0])
+        estimates = array("d", [heuristic_fn(boxes, self) if heuristic_fn else 0])
+        frontier = [(estimates[root], root)]
+
+        expanded_nodes = 0
+        pruned_nodes = 0
 
         while frontier:
-            _, _, g, node = heapq.heappop(frontier)
+            _, node = heapq.heappop(frontier)
             expanded_nodes += 1
 
-            if all(box in self.targets for box in node.boxes):
-                frontier_count = len(frontier)
-                targets_dict = [{"x": target[0], "y": target[1]} for target in self.targets]
-                path = node.get_path()
-                return {
-                    "map": self.map,
-                    "targets": targets_dict,
-                    "frontier_nodes": frontier_count,
-                    "expanded_nodes": expanded_nodes,
-                    "steps": len(path) - 1,
-                    "path": path,
-                }
-
-            for move, (dx, dy) in movimientos.items():
-                new_player = (node.player[0] + dx, node.player[1] + dy)
-
-                if self.map[new_player[1]][new_player[0]] == Chars.WALL:
+            player = store.players[node]
+            boxes = store.boxes[node]
+            h = estimates[node]
+
+            if boxes & self.targets_mask == boxes:
+                pushes = [(move >> 2, move & 3) for move in store.path(node)]
+                return self.build_solution(self.expand_pushes(pushes), len(frontier), expanded_nodes, pruned_nodes)
+
+            reach = self.reachable(player, boxes)
+            boxes_key = store.keys[node] ^ self.zobrist_player[player]
+
+            for box, direction, new_boxes, new_box, new_boxes_key in self.push_successors(reach, boxes, boxes_key):
+                new_reach = self.reachable(box, new_boxes)
+                new_player = (new_reach & -new_reach).bit_length() - 1
+                new_key = new_boxes_key ^ self.zobrist_player[new_player]
+                new_g = costs[node] + 1
+                known = store.find(new_key)
+
+                if known >= 0 and costs[known] <= new_g:
+                    continue
+
+                if self.is_freeze_deadlock(new_boxes, new_box):
+                    pruned_nodes += 1
                     continue
 
-                new_boxes = node.boxes
+                new_h = heuristic_fn(new_boxes, self, h, (box, new_box)) if heuristic_fn else 0
+
+                if known < 0:
+                    known = store.add(new_key, node, box << 2 | direction, new_player, new_boxes)
+                    costs.append(new_g)
+                    estimates.append(new_h)
+                else:
+                    store.parents[known] = node
+                    store.moves[known] = box << 2 | direction
+                    costs[known] = new_g
+
+                priority = new_h if not use_astar else new_g + new_h
+                heapq.heappush(frontier, (priority, known))
+
+        return None
+
+    def bidirectional_search(self):
+        # BFS a nivel de empujes desde ambos extremos: hacia adelante empujando
+        # desde el estado inicial y hacia atrás tirando de las cajas desde
+        # cada configuración objetivo, con un nodo por región del jugador.
+        # Ambas búsquedas usan la misma clave que `push_search`, así que se
+        # encuentran cuando una genera un estado que la otra ya tiene. Se
+        # expande siempre una capa completa del lado con menos frontera y al
+        # terminarla se elige el encuentro de menor costo, que es óptimo en
+        # cantidad de empujes
+        boxes = self.encode_boxes(self.boxes)
+        reach = self.reachable(self.cell_index[self.player], boxes)
+        player = (reach & -reach).bit_length() - 1
+        forward = NodeStore()
+        forward.add(self.zobrist(boxes) ^ self.zobrist_player[player], -1, -1, player, boxes)
+
+        # Si hay más objetivos que cajas, cualquier subconjunto de objetivos
+        # del tamaño correcto es una configuración final
+        backward = NodeStore()
+        goals = combinations(self.target_cells, len(self.boxes))
+
+        for goal_cells in goals:
+            goal = sum(1 << target for target in goal_cells)
+            goal_key = self.zobrist(goal)
+            free = ((1 << len(self.cells)) - 1) & ~goal
+
+            while free:
+                cell = (free & -free).bit_length() - 1
+                free &= ~self.reachable(cell, goal)
+                backward.add(goal_key ^ self.zobrist_player[cell], -1, -1, cell, goal)
+
+        stores = (forward, backward)
+        depths = (array("i", [0]) * len(forward), array("i", [0]) * len(backward))
+        heads = [0, 0]
+
+        meet = backward.find(forward.keys[0])
+        best = (0, 0, meet) if meet >= 0 else None
+
+        expanded_nodes = 0
+        pruned_nodes = 0
+
+        while best is None and heads[0] < len(forward) and heads[1] < len(backward):
+            side = 0 if len(forward) - heads[0] <= len(backward) - heads[1] else 1
+            store = stores[side]
+            other = stores[1 - side]
+            depth = depths[side]
+            successors = self.push_successors if side == 0 else self.pull_successors
+            end = len(store)
+
+            for node in range(heads[side], end):
+                expanded_nodes += 1
+
+                player = store.players[node]
+                boxes = store.boxes[node]
+                reach = self.reachable(player, boxes)
+                boxes_key = store.keys[node] ^ self.zobrist_player[player]
+
+                for box, direction, new_boxes, new_box, new_boxes_key in successors(reach, boxes, boxes_key):
+                    # Los movimientos se guardan siempre como el empuje hacia
+                    # adelante, para poder concatenar ambas mitades
+                    if side == 0:
+                        new_reach = self.reachable(box, new_boxes)
+                        move = box << 2 | direction
+                    else:
+                        new_reach = self.reachable(self.neighbors[new_box][direction], new_boxes)
+                        move = new_box << 2 | direction ^ 1
+
+                    new_player = (new_reach & -new_reach).bit_length() - 1
+                    new_key = new_boxes_key ^ self.zobrist_player[new_player]
 
-                if new_player in node.boxes:
-                    new_box = (new_player[0] + dx, new_player[1] + dy)
+                    if store.find(new_key) >= 0:
+                        continue
 
-                    if new_box in node.boxes or self.map[new_box[1]][new_box[0]] == Chars.WALL:
+                    if side == 0 and self.is_freeze_deadlock(new_boxes, new_box):
+                        pruned_nodes += 1
                         continue
 
-                    new_boxes = frozenset((new_box if box == new_player else box) for box in node.boxes)
+                    known = store.add(new_key, node, move, new_player, new_boxes)
+                    depth.append(depth[node] + 1)
+                    meet = other.find(new_key)
 
-                new_state = (new_player, new_boxes)
-                new_g = g + 1
+                    if meet >= 0:
+                        cost = depth[known] + depths[1 - side][meet]
+                        if best is None or cost < best[0]:
+                            best = (cost, known, meet) if side == 0 else (cost, meet, known)
 
-                if new_state not in visited or new_g < visited[new_state]:
-                    visited[new_state] = new_g
-                    new_node = State(new_player, new_boxes, move, node)
-                    h = heuristic_fn(new_node, self.targets)
-                    priority = h if not use_astar else new_g + h
-                    heapq.heappush(frontier, (priority, next(counter), new_g, new_node))
+            heads[side] = end
 
-        return None
+        if best is None:
+            return None
+
+        _, forward_node, backward_node = best
+        moves = forward.path(forward_node)
+
+        while backward.parents[backward_node] >= 0:
+            moves.append(backward.moves[backward_node])
+            backward_node = backward.parents[backward_node]
+
+        pushes = [(move >> 2, move & 3) for move in moves]
+        frontier_nodes = len(forward) - heads[0] + len(backward) - heads[1]
+        return self.build_solution(self.expand_pushes(pushes), frontier_nodes, expanded_nodes, pruned_nodes)
+
+
+# Todas las heurísticas reciben las cajas del estado y el nivel. Cuando se pasa
+# `parent_h` junto con `moved = (celda_anterior, celda_nueva)` de la única caja
+# que se movió, las heurísticas aditivas actualizan el valor del padre en O(1)
+# en lugar de recorrer todas las cajas; las demás lo ignoran y recalculan
+
+
+def heuristica_manhattan(boxes: int, sokoban: Sokoban, parent_h: int | None = None, moved: tuple[int, int] | None = None) -> int:
+    distances = sokoban.manhattan_distances
+
+    if moved is not None:
+        return parent_h - distances[moved[0]] + distances[moved[1]]
+
+    return sum(distances[box] for box in sokoban.box_cells(boxes))
+
+
+def heuristica_euclidean(boxes: int, sokoban: Sokoban, parent_h: float | None = None, moved: tuple[int, int] | None = None) -> float:
+    distances = sokoban.euclidean_distances
+
+    if moved is not None:
+        return parent_h - distances[moved[0]] + distances[moved[1]]
+
+    return sum(distances[box] for box in sokoban.box_cells(boxes))
+
+
+def heuristica_matching(boxes: int, sokoban: Sokoban, parent_h: int | None = None, moved: tuple[int, int] | None = None) -> int:
+    # Asigna cada caja a un objetivo distinto minimizando la suma de las
+    # distancias de empuje precalculadas, que respetan las paredes. No es
+    # aditiva, así que siempre se recalcula completa
+    cost = [sokoban.push_distances[box] for box in sokoban.box_cells(boxes)]
+    return min_cost_matching(cost)
+
+
+def min_cost_matching(cost: list[list[int]]) -> int:
+    # Algoritmo húngaro con potenciales, O(n² m) para n filas y m >= n columnas
+    n = len(cost)
+    m = len(cost[0]) if n else 0
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    match = [0] * (m + 1)
+    way = [0] * (m + 1)
 
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        minv = [float("inf")] * (m + 1)
+        used = [False] * (m + 1)
 
-def heuristica_manhattan(node: State, targets: set[tuple[int, int]]) -> int:
-    total = 0
-    
-    for box in node.boxes:
-        distancias = [abs(box[0] - goal[0]) + abs(box[1] - goal[1]) for goal in targets]
-        total += min(distancias)
+        while match[j0] != 0:
+            used[j0] = True
+            i0 = match[j0]
+            row = cost[i0 - 1]
+            delta = float("inf")
+            j1 = 0
 
-    return total
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = row[j - 1] - u[i0] - v[j]
+                    if reduced < minv[j]:
+                        minv[j] = reduced
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
 
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
 
-def heuristica_euclidean(node: State, targets: set[tuple[int, int]]) -> int:
-    total = 0
+            j0 = j1
 
-    for box in node.boxes:
-        distancias = [((box[0] - goal[0]) ** 2 + (box[1] - goal[1]) ** 2) ** 0.5 for goal in targets]
-        total += min(distancias)
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
 
-    return total
+    return sum(cost[match[j] - 1][j - 1] for j in range(1, m + 1) if match[j])